@@ -12,7 +12,27 @@ See https://pyxll.medium.com/live-streaming-crypto-prices-in-excel-aaa41628bc53
 from pyxll import xl_func, RTD, get_event_loop
 import websockets
 import asyncio
-import json
+import sys
+
+# Use orjson for decoding websocket messages if it's installed. It's
+# significantly faster than the standard json module, and JSON parsing
+# is the main CPU cost when subscribed to many instruments.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+
+# The instrument table uses a fixed set of field names that get re-parsed
+# on every frame. Interning them means the per-frame dicts re-use the same
+# key objects (with cached hashes) instead of allocating identical strings.
+_FIELD_INTERN = {name: sys.intern(name) for name in (
+    "symbol", "timestamp", "lastPrice", "bidPrice", "askPrice", "midPrice",
+    "markPrice", "openInterest", "volume", "volume24h", "turnover24h",
+    "highPrice", "lowPrice", "prevClosePrice", "lastChangePcnt",
+)}
 
 
 class BitMex:
@@ -20,6 +40,12 @@ class BitMex:
 
     URI = "wss://www.bitmex.com/realtime"
 
+    # Pre-formatted subscribe/unsubscribe messages. Symbols are plain
+    # ASCII so there's no need to run json.dumps per message, and
+    # sending bytes skips the UTF-8 encode inside websockets.
+    _SUB_MSG = b'{"op":"subscribe","args":["instrument:%s"]}'
+    _UNSUB_MSG = b'{"op":"unsubscribe","args":["instrument:%s"]}'
+
     def __init__(self):
         self.__websocket = None
         self.__running = False
@@ -31,7 +57,10 @@ class BitMex:
     async def __connect(self):
         # Connect to the websocket API and start the __run coroutine
         self.__running = True
-        self.__websocket = await websockets.connect(self.URI)
+        # Disable permessage-deflate: the instrument frames are small
+        # JSON messages where per-message inflate costs more CPU than
+        # the bandwidth saved on a single long-lived stream.
+        self.__websocket = await websockets.connect(self.URI, compression=None, max_size=2**22)
         self.__running_task = asyncio.create_task(self.__run())
 
     async def __disconnect(self):
@@ -43,38 +72,85 @@ class BitMex:
 
     async def __run(self):
         # Read from the websocket until disconnected
+        try:
+            await self.__run_until_closed()
+        except websockets.ConnectionClosed:
+            # The websocket was closed, either by __disconnect or the server
+            pass
+
+    async def __run_until_closed(self):
         while self.__running:
             msg = await self.__websocket.recv()
-            await self.__process_message(json.loads(msg))
-
-    async def __process_message(self, msg):
-        if msg.get("table", None) == "instrument":
-            # Extract the data from the message, update our data dictionary and notify subscribers
-            for data in msg.get("data", []):
-                symbol = data["symbol"]
-                timestamp = data["symbol"]
-
-                # Update the latest values in our data dictionary and notify any subscribers
-                tasks = []
-                subscribers = self.__subscriptions.get(symbol, {})
-                latest = self.__data.setdefault(symbol, {})
-                for field, value in data.items():
-                    latest[field] = (value, timestamp)
-
-                    # Notify the subscribers with the updated field
-                    for subscriber in subscribers.get(field, []):
-                        coro = subscriber(symbol, field, value, timestamp)
-                        tasks.append(asyncio.create_task(coro))
-
-                # await all the tasks from the subscribers
-                if tasks:
-                    await asyncio.wait(tasks)
+            msgs = [_json_loads(msg)]
+
+            # Drain any frames that have already been received so that a
+            # burst of updates can be coalesced into a single pass over
+            # the subscribers. Cancelling 'recv' is safe and doesn't
+            # lose any messages.
+            while self.__running:
+                recv = asyncio.ensure_future(self.__websocket.recv())
+
+                # Yield to the event loop so 'recv' can complete if
+                # another frame is already waiting.
+                await asyncio.sleep(0)
+
+                if not recv.done():
+                    recv.cancel()
+                    break
+                msgs.append(_json_loads(recv.result()))
+
+            await self.__process_messages(msgs)
+
+    async def __process_messages(self, msgs):
+        # Merge the data from all messages by symbol, keeping only the
+        # latest update for each field. This way each subscriber is only
+        # notified once however many frames were received.
+        merged = {}
+        for msg in msgs:
+            if msg.get("table", None) == "instrument":
+                for data in msg.get("data", []):
+                    # Swap the parsed keys for the interned field names
+                    data = {_FIELD_INTERN.get(field, field): value
+                            for field, value in data.items()}
+                    merged.setdefault(data["symbol"], {}).update(data)
+
+        # Update our data dictionary and notify subscribers
+        tasks = []
+        for symbol, data in merged.items():
+            timestamp = data.get("timestamp")
+
+            # If there are no subscribers for this symbol just update the
+            # latest values in a single pass and skip the fan-out loop.
+            subscribers = self.__subscriptions.get(symbol, {})
+            if not subscribers:
+                self.__data[symbol] = {field: (value, timestamp)
+                                       for field, value in data.items()}
+                continue
+
+            # Update the latest values in our data dictionary and notify any subscribers
+            latest = self.__data.setdefault(symbol, {})
+            for field, value in data.items():
+                latest[field] = (value, timestamp)
+
+                # Notify the subscribers with the updated field. Plain
+                # functions are called inline; coroutine functions are
+                # collected and awaited together below.
+                for subscriber in subscribers.get(field, {}).values():
+                    if asyncio.iscoroutinefunction(subscriber):
+                        tasks.append(subscriber(symbol, field, value, timestamp))
+                    else:
+                        subscriber(symbol, field, value, timestamp)
+
+        # await all the subscriber coroutines together
+        if tasks:
+            await asyncio.gather(*tasks)
 
     async def subscribe(self, symbol, field, callback):
         """Subscribe to updates for a specific symbol and field.
 
-        The callback will be called as 'await callback(symbol, field, value, timestamp)'
-        whenever an update is received.
+        The callback will be called as 'callback(symbol, field, value, timestamp)'
+        whenever an update is received. It may be a plain function or a
+        coroutine function; plain functions avoid scheduling a task per update.
         """
         async with self.__lock:
             # Connect the websocket if necessary
@@ -83,36 +159,39 @@ class BitMex:
 
             # Send the subscribe message if we're not already subscribed
             if symbol not in self.__subscriptions:
-                msg = {"op": "subscribe", "args": [f"instrument:{symbol}"]}
-                await self.__websocket.send(json.dumps(msg))
+                await self.__websocket.send(self._SUB_MSG % symbol.encode())
 
-            # Add the subscriber to the dict of subscriptions
-            self.__subscriptions.setdefault(symbol, {}).setdefault(field, []).append(callback)
+            # Add the subscriber to the dict of subscriptions. Keying by
+            # id(callback) makes removal O(1) in unsubscribe.
+            self.__subscriptions.setdefault(symbol, {}).setdefault(field, {})[id(callback)] = callback
 
             # Call the callback with the latest data
             data = self.__data.get(symbol, {})
             if field in data:
                 (value, timestamp) = data[field]
-                await callback(symbol, field, value, timestamp)
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(symbol, field, value, timestamp)
+                else:
+                    callback(symbol, field, value, timestamp)
 
     async def unsubscribe(self, symbol, field, callback):
         async with self.__lock:
-            # Remove the subscriber from the list of subscriptions
-            self.__subscriptions[symbol][field].remove(callback)
+            # Remove the subscriber from the dict of subscriptions
+            del self.__subscriptions[symbol][field][id(callback)]
             if not self.__subscriptions[symbol][field]:
                 del self.__subscriptions[symbol][field]
 
             # Unsubscribe if we no longer have any subscriptions for this instrument
             if not self.__subscriptions[symbol]:
-                msg = {"op": "unsubscribe", "args": [f"instrument:{symbol}"]}
-                await self.__websocket.send(json.dumps(msg))
+                await self.__websocket.send(self._UNSUB_MSG % symbol.encode())
                 del self.__subscriptions[symbol]
                 self.__data.pop(symbol, None)
 
-            # Disconnect if we no longer have any subscriptions
+            # Disconnect if we no longer have any subscriptions. The lock
+            # is already held here; asyncio.Lock is not re-entrant so
+            # re-acquiring it would deadlock.
             if not self.__subscriptions:
-                async with self.__lock:
-                    await self.__disconnect()
+                await self.__disconnect()
 
 
 class BitMexRTD(RTD):
@@ -120,6 +199,10 @@ class BitMexRTD(RTD):
     BitMex class above.
     """
 
+    # A workbook can easily contain thousands of RTD cells, so store the
+    # per-instance attributes in slots rather than a per-instance dict.
+    __slots__ = ("__symbol", "__field")
+
     # Use a single BitMex object for all RTD functions
     __bitmex_client = None
 
@@ -146,8 +229,10 @@ class BitMexRTD(RTD):
             cls.__bitmex_client = BitMex()
         return cls.__bitmex_client
 
-    async def __update(self, symbol, field, value, timestamp):
-        # Update the value in Excel
+    def __update(self, symbol, field, value, timestamp):
+        # Update the value in Excel. This is a plain function rather than
+        # a coroutine so no task needs to be scheduled per tick just to
+        # do an attribute assignment.
         self.value = value
 
 
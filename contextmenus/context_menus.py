@@ -4,82 +4,82 @@ Requires PyXLL >= 4 and Excel >= 2010.
 See ribbon.xml.
 """
 from pyxll import xl_app
+from win32com.client import constants
 
-def toggle_case(control):
-    """Toggle the case of the currently selected cells"""
+
+def _apply_to_selection(func):
+    """Apply 'func' to the value of any text cells in the current selection.
+
+    Only constant text cells are considered: formula cells are excluded
+    with SpecialCells so that writing values back can never flatten a
+    formula to its computed value.
+
+    The values are read and written back one Area at a time rather than
+    one cell at a time. Each cell access is a cross-process COM call, so
+    batching reduces the number of round-trips to Excel from two per cell
+    to two per contiguous area.
+    """
     # get the Excel Application object
     xl = xl_app()
 
-    # iterate over the currently selected cells
-    for cell in xl.Selection:
-        # get the cell value
-        value = cell.Value
-
-        # skip any cells that don't contain text
-        if not isinstance(value, str):
+    # restrict the selection to constant text cells; SpecialCells raises
+    # if the selection doesn't contain any
+    try:
+        cells = xl.Selection.SpecialCells(constants.xlCellTypeConstants,
+                                          constants.xlTextValues)
+    except:
+        return
+
+    # the text cells can be spread over multiple non-contiguous areas
+    for area in cells.Areas:
+        # read all the values in the area with a single COM call
+        values = area.Value
+
+        # for a single cell 'Value' is a scalar, not a tuple of tuples
+        if not isinstance(values, tuple):
+            if isinstance(values, str):
+                new_value = func(values)
+                if new_value != values:
+                    area.Value = new_value
             continue
 
-        # toggle between upper, lower and proper case
-        if value.isupper():
-            value = value.lower()
-        elif value.islower():
-            value = value.title()
-        else:
-            value = value.upper()
+        # transform the text cells in pure Python
+        new_values = [[func(value) if isinstance(value, str) else value
+                       for value in row] for row in values]
 
-        # set the modified value on the cell
-        cell.Value = value
+        # write the values back with a single COM call, but only if the
+        # transform actually changed something
+        if new_values != [list(row) for row in values]:
+            area.Value = new_values
 
 
-def tolower(control):
-    """Set the currently selected cells to lower case"""
-    # get the Excel Application object
-    xl = xl_app()
+def _toggle(value):
+    # toggle between upper, lower and proper case
+    if value.isupper():
+        return value.lower()
+    elif value.islower():
+        return value.title()
+    return value.upper()
 
-    # iterate over the currently selected cells
-    for cell in xl.Selection:
-        # get the cell value
-        value = cell.Value
 
-        # skip any cells that don't contain text
-        if not isinstance(value, str):
-            continue
+def toggle_case(control):
+    """Toggle the case of the currently selected cells"""
+    _apply_to_selection(_toggle)
 
-        cell.Value = value.lower()
+
+def tolower(control):
+    """Set the currently selected cells to lower case"""
+    _apply_to_selection(str.lower)
 
 
 def toupper(control):
     """Set the currently selected cells to upper case"""
-    # get the Excel Application object
-    xl = xl_app()
-
-    # iterate over the currently selected cells
-    for cell in xl.Selection:
-        # get the cell value
-        value = cell.Value
-
-        # skip any cells that don't contain text
-        if not isinstance(value, str):
-            continue
-
-        cell.Value = value.upper()
+    _apply_to_selection(str.upper)
 
 
 def toproper(control):
     """Set the currently selected cells to 'proper' case"""
-    # get the Excel Application object
-    xl = xl_app()
-
-    # iterate over the currently selected cells
-    for cell in xl.Selection:
-        # get the cell value
-        value = cell.Value
-
-        # skip any cells that don't contain text
-        if not isinstance(value, str):
-            continue
-
-        cell.Value = value.title()
+    _apply_to_selection(str.title)
 
 
 def dynamic_menu(control):
@@ -89,11 +89,11 @@ def dynamic_menu(control):
             <button id="Menu2Button1" label="Upper Case"
                 imageMso="U"
                 onAction="context_menus.toupper"/>
- 
+
             <button id="Menu2Button2" label="Lower Case"
                 imageMso="L"
                 onAction="context_menus.tolower"/>
- 
+
             <button id="Menu2Button3" label="Proper Case"
                 imageMso="P"
                 onAction="context_menus.toproper"/>
@@ -78,47 +78,56 @@ class FillFormatter(Formatter):
         # Get the previous and new Range objects from the cells as win32com objects.
         prev_range = prev_cell.to_range(com_package="win32com")
         new_range = cell.to_range(com_package="win32com")
-        
+
+        # Read the range dimensions into locals once. Every property
+        # access is a cross-process COM call, so don't repeat them.
+        prev_num_rows = prev_range.Rows.Count
+        prev_num_cols = prev_range.Columns.Count
+        new_num_rows = new_range.Rows.Count
+        new_num_cols = new_range.Columns.Count
+        num_headers = self.__num_headers
+
+        # Bind the paste constants to locals too.
+        xl_paste_formats = constants.xlPasteFormats
+        xl_none = constants.xlNone
+
         # Check if the range is shrinking and clear the formatting if it is.
-        if prev_range.Rows.Count > new_range.Rows.Count:
-            num_rows = prev_range.Rows.Count - new_range.Rows.Count
-            rows = prev_range.GetOffset(RowOffset=new_range.Rows.Count)
-            rows = rows.GetResize(RowSize=num_rows)
+        if prev_num_rows > new_num_rows:
+            rows = prev_range.GetOffset(RowOffset=new_num_rows)
+            rows = rows.GetResize(RowSize=prev_num_rows - new_num_rows)
             rows.ClearFormats()
-        
-        if prev_range.Columns.Count > new_range.Columns.Count:
-            num_cols = prev_range.Columns.Count - new_range.Columns.Count
-            cols = prev_range.GetOffset(ColumnOffset=new_range.Columns.Count)
-            cols = cols.GetResize(ColumnSize=num_cols)
+
+        if prev_num_cols > new_num_cols:
+            cols = prev_range.GetOffset(ColumnOffset=new_num_cols)
+            cols = cols.GetResize(ColumnSize=prev_num_cols - new_num_cols)
             cols.ClearFormats()
-        
+
         # Copy the formatting if the range has expanded.
-        if new_range.Columns.Count > prev_range.Columns.Count \
-        or new_range.Rows.Count > prev_range.Rows.Count:
+        if new_num_cols > prev_num_cols or new_num_rows > prev_num_rows:
             prev_rows = prev_range
             new_rows = new_range
 
             # If we have header rows then copy those separately from the rest.
-            if self.__num_headers > 0:
-                prev_header = prev_range.GetResize(RowSize=self.__num_headers)
-                new_header = new_range.GetResize(RowSize=self.__num_headers)
-                
+            if num_headers > 0:
+                prev_header = prev_range.GetResize(RowSize=num_headers)
+                new_header = new_range.GetResize(RowSize=num_headers)
+
                 prev_header.Copy()
-                new_header.PasteSpecial(Paste=constants.xlPasteFormats,
-                                        Operation=constants.xlNone)
-        
-                if prev_range.Rows.Count > self.__num_headers:
-                    prev_rows = prev_rows.GetOffset(RowOffset=self.__num_headers)
-                    prev_rows = prev_rows.GetResize(RowSize=prev_range.Rows.Count - self.__num_headers)
-                    
-                    new_rows = new_rows.GetOffset(RowOffset=self.__num_headers)
-                    new_rows = new_rows.GetResize(RowSize=new_range.Rows.Count - self.__num_headers)
-        
+                new_header.PasteSpecial(Paste=xl_paste_formats,
+                                        Operation=xl_none)
+
+                if prev_num_rows > num_headers:
+                    prev_rows = prev_rows.GetOffset(RowOffset=num_headers)
+                    prev_rows = prev_rows.GetResize(RowSize=prev_num_rows - num_headers)
+
+                    new_rows = new_rows.GetOffset(RowOffset=num_headers)
+                    new_rows = new_rows.GetResize(RowSize=new_num_rows - num_headers)
+
             # Copy for the formatting from the previous range to the new one.
             prev_rows.Copy()
-            new_rows.PasteSpecial(Paste=constants.xlPasteFormats,
-                                  Operation=constants.xlNone)
-        
+            new_rows.PasteSpecial(Paste=xl_paste_formats,
+                                  Operation=xl_none)
+
             # End copy/paste mode.
             new_rows.Application.CutCopyMode = False
 
@@ -8,6 +8,7 @@ https://www.pyxll.com/blog/interactive-charts-in-excel-with-highcharts
 from pyxll import xl_func
 from highcharts_xl import hc_plot
 from highcharts import Highchart
+import numpy as np
 
 
 @xl_func("var[][] data, str title, str subtitle, str y_axis, str[] labels, str theme")
@@ -36,11 +37,13 @@ def hc_basic_line(data, title, subtitle=None, y_axis=None, labels=None, theme=No
         "verticalAlign": "middle"
     })
 
-    # transform the data from a list of rows to a list of columns
-    data_t = list(zip(*data))
+    # transform the data from a list of rows to a list of columns.
+    # Transposing the array is just a stride change, so only the columns
+    # actually used get materialized as lists.
+    arr = np.asarray(data, dtype=object)
 
     # Use the first column as the X axis
-    x_axis = data_t[0]
+    x_axis = arr[:, 0].tolist()
 
     H.set_options("xAxis", {
         "categories": x_axis,
@@ -48,10 +51,11 @@ def hc_basic_line(data, title, subtitle=None, y_axis=None, labels=None, theme=No
     })
 
     # And the remaining columns as the graph data
+    series_cols = arr[:, 1:].T
     if not labels:
-        labels = ["series_%d" % i for i in range(len(data_t)-1)]
+        labels = ["series_%d" % i for i in range(len(series_cols))]
 
-    for label, series in zip(labels, data_t[1:]):
-        H.add_data_set(series, series_type='line', name=label)
+    for label, series in zip(labels, series_cols):
+        H.add_data_set(series.tolist(), series_type='line', name=label)
 
     return hc_plot(H, title, theme)
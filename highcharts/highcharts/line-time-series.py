@@ -8,6 +8,8 @@ https://www.pyxll.com/blog/interactive-charts-in-excel-with-highcharts
 from pyxll import xl_func, get_type_converter
 from highcharts_xl import hc_plot
 from highcharts import Highchart
+import pandas as pd
+import numpy as np
 
 
 @xl_func
@@ -15,8 +17,17 @@ def hc_line_time_series(data, title, y_title=None, theme=None, xl_dates=False):
     """Plots a 2d array of times and data points."""
     # Convert Excel dates to datetimes if necessary
     if xl_dates:
-        to_date = get_type_converter("var", "datetime")
-        data = [(to_date(d), v) for d, v in data]
+        arr = np.asarray(data, dtype=object)
+        try:
+            # Excel serial dates are days since 1899-12-30, so the whole
+            # column can be converted with one vectorized call instead of
+            # going through the type converter row by row
+            dates = pd.to_datetime(arr[:, 0].astype(float), unit="D", origin="1899-12-30")
+        except (TypeError, ValueError):
+            # fall back to the pyxll converter for non-numeric dates
+            to_date = get_type_converter("var", "datetime")
+            dates = [to_date(d) for d in arr[:, 0]]
+        data = list(zip(dates, arr[:, 1]))
 
     H = Highchart()
 
@@ -66,4 +77,3 @@ def hc_line_time_series(data, title, y_title=None, theme=None, xl_dates=False):
     })
 
     return hc_plot(H, title, theme)
-\
\ No newline at end of file
@@ -10,12 +10,42 @@ https://www.pyxll.com/blog/interactive-charts-in-excel-with-highcharts
 """
 from pyxll import xl_func, xl_app, xlfCaller
 from highcharts.highstock.highstock_helper import jsonp_loader
-from bs4 import BeautifulSoup
 import tempfile
 import timer
 import re
 import os
 
+# meta tag inserted into the chart html so the embedded browser renders
+# in edge mode
+_META_TAG = '<meta http-equiv="X-UA-Compatible" content="IE=edge">'
+
+# pattern for splitting "[Book1.xlsx]Sheet1" style sheet names, compiled
+# once rather than on every plot
+_SHEET_RE = re.compile(r"^\[(.+?)\](.*)$")
+
+# cache of (workbook name, sheet name) -> Worksheet COM object, so charts
+# that refresh on every recalc don't pay three COM round-trips each time
+_sheet_cache = {}
+
+
+def _get_sheet(workbook_name, sheet_name):
+    """Get the Worksheet COM object for a workbook and sheet name."""
+    key = (workbook_name, sheet_name)
+    sheet = _sheet_cache.get(key)
+    if sheet is not None:
+        try:
+            # make sure the cached handle is still alive; the workbook
+            # may have been closed since it was cached
+            sheet.Name
+            return sheet
+        except:
+            del _sheet_cache[key]
+
+    xl = xl_app()
+    sheet = xl.Workbooks(workbook_name).Sheets(sheet_name)
+    _sheet_cache[key] = sheet
+    return sheet
+
 
 def hc_plot(chart, control_name, theme=None):
     """
@@ -31,15 +61,13 @@ def hc_plot(chart, control_name, theme=None):
     sheet_name = caller.sheet_name
 
     # split into workbook and sheet name
-    match = re.match("^\[(.+?)\](.*)$", sheet_name.strip("'\""))
+    match = _SHEET_RE.match(sheet_name.strip("'\""))
     if not match:
         raise Exception("Unexpected sheet name '%s'" % sheet_name)
     workbook, sheet = match.groups()
 
     # get the Worksheet object
-    xl = xl_app()
-    workbook = xl.Workbooks(workbook)
-    sheet = workbook.Sheets(sheet)
+    sheet = _get_sheet(workbook, sheet)
 
     # find the existing webbrowser control, or create a new one
     try:
@@ -64,15 +92,20 @@ def hc_plot(chart, control_name, theme=None):
              "width": "%d%%" % (100. * control.Width / control.Height)
          })
 
-    # get the html and add the 'X-UA-Compatible' meta-tag
-    soup = BeautifulSoup(chart.htmlcontent)
-    metatag = soup.new_tag("meta")
-    metatag.attrs["http-equiv"] = "X-UA-Compatible"
-    metatag.attrs['content'] = "IE=edge"
-    soup.head.insert(0, metatag)
-
-    # write out the html for the browser to render
-    fh = tempfile.NamedTemporaryFile("wt", suffix=".html", delete=False)
+    # get the html and add the 'X-UA-Compatible' meta-tag. Splicing the
+    # tag in with a string find avoids parsing and re-writing the whole
+    # page just to insert one element.
+    html = chart.htmlcontent
+    idx = html.find("<head>")
+    if idx < 0:
+        raise Exception("No <head> tag found in the chart html")
+    idx += len("<head>")
+    html = html[:idx] + _META_TAG + html[idx:]
+
+    # write out the html for the browser to render. Write utf-8 bytes
+    # through a large buffer so the page goes out in as few writes as
+    # possible, with no text-mode newline translation pass.
+    fh = tempfile.NamedTemporaryFile("wb", suffix=".html", delete=False, buffering=1 << 20)
     filename = fh.name
 
     # clean up the file after 10 seconds to give the browser time to load
@@ -81,7 +114,7 @@ def hc_plot(chart, control_name, theme=None):
         os.unlink(filename)
     timer.set_timer(10000, on_timer)
 
-    fh.write(soup.prettify())
+    fh.write(html.encode("utf-8"))
     fh.close()
 
     # navigate to the temporary file
@@ -8,35 +8,24 @@ https://www.pyxll.com/blog/interactive-charts-in-excel-with-highcharts
 from pyxll import xl_func
 from highcharts import Highstock
 from highcharts_xl import hc_plot
+import numpy as np
 
 
 @xl_func
 def hc_candlestick_and_volume(data, title, theme=None):
     H = Highstock()
 
-    ohlc = []
-    volume = []
     groupingUnits = [
         ['week', [1]],
         ['month', [1, 2, 3, 4, 6]]
     ]
 
-    for i in range(len(data)):
-        ohlc.append(
-            [
-            data[i][0], # the date
-            data[i][1], # open
-            data[i][2], # high
-            data[i][3], # low
-            data[i][4]  # close
-            ]
-            )
-        volume.append(
-            [
-            data[i][0], # the date
-            data[i][5]  # the volume
-            ]
-        )
+    # split the rows into [date, open, high, low, close] and
+    # [date, volume] with two numpy slices rather than a Python loop
+    # over every bar
+    arr = np.asarray(data, dtype=object)
+    ohlc = arr[:, 0:5].tolist()
+    volume = arr[:, [0, 5]].tolist()
 
     options = {
         'rangeSelector': {
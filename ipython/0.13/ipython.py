@@ -8,6 +8,7 @@ This version is intended to work with IPython 0.13 only.
 """
 from pyxll import xl_menu
 import logging
+import shutil
 import timer
 import sys
 import os
@@ -36,6 +37,9 @@ def ipython_qtconsole():
     proc.start()
 
 
+_cached_pythonw = None
+
+
 def _fixup_sys_executable():
     """
     Set sys.executable to the default python executable, if it's not already set.
@@ -49,32 +53,37 @@ def _fixup_sys_executable():
     if sys.executable and os.path.basename(sys.executable) in ("python.exe", "pythonw.exe"):
         return
 
+    # re-use the previously found executable rather than re-scanning the
+    # PATH every time the menu item is invoked
+    global _cached_pythonw
+    if _cached_pythonw:
+        sys.executable = _cached_pythonw
+        return
+
     executable = _which("pythonw.exe")
     if not executable:
         _log.error("Couldn't find pythonw.exe on the PATH. Starting the subprocess will fail.")
         return
 
     _log.info("Setting sys.executable to '%s'" % executable)
+    _cached_pythonw = executable
     sys.executable = executable
 
 
-def _which(program):
-    """find an exe's full path by looking at the PATH environment variable"""
-    def is_exe(fpath):
-        return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
+_which_cache = {}
 
-    fpath, fname = os.path.split(program)
-    if fpath:
-        if is_exe(program):
-            return program
-    else:
-        for path in os.environ["PATH"].split(os.pathsep):
-            path = path.strip('"')
-            exe_file = os.path.join(path, program)
-            if is_exe(exe_file):
-                return exe_file
 
-    return None
+def _which(program):
+    """find an exe's full path by looking at the PATH environment variable"""
+    # shutil.which handles PATHEXT and probes each directory with fewer
+    # stat calls than the isfile/access pair per candidate; successful
+    # lookups are cached so repeated calls don't re-scan the PATH
+    path = _which_cache.get(program)
+    if path is None:
+        path = shutil.which(program)
+        if path:
+            _which_cache[program] = path
+    return path
 
 
 def _start_kernel():
@@ -7,7 +7,9 @@ a notebook to an existing kernel, the notebook app always creates its own.
 This version is intended to work with IPython versions 1.x only.
 """
 from pyxll import xl_menu
+import functools
 import logging
+import shutil
 import timer
 import sys
 import os
@@ -58,23 +60,13 @@ def _fixup_sys_executable():
     sys.executable = executable
 
 
+@functools.lru_cache(maxsize=16)
 def _which(program):
     """find an exe's full path by looking at the PATH environment variable"""
-    def is_exe(fpath):
-        return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
-
-    fpath, fname = os.path.split(program)
-    if fpath:
-        if is_exe(program):
-            return program
-    else:
-        for path in os.environ["PATH"].split(os.pathsep):
-            path = path.strip('"')
-            exe_file = os.path.join(path, program)
-            if is_exe(exe_file):
-                return exe_file
-
-    return None
+    # shutil.which handles PATHEXT and needs fewer stat calls per PATH
+    # entry than checking isfile and access separately; the lru_cache
+    # saves re-scanning the PATH on repeated lookups
+    return shutil.which(program)
 
 
 def _start_kernel():
@@ -15,10 +15,23 @@ executable = <path to your python installation>/pythonw.exe
 """
 from pyxll import xl_menu
 import logging
+import shutil
 import timer
 import sys
 import os
 
+# import IPython and the kernel machinery once at module load rather
+# than on every menu click; guarded so the add-in still loads without
+# IPython installed
+try:
+    import IPython
+    import zmq
+    from IPython.terminal.ipapp import TerminalIPythonApp
+    from ipykernel.kernelapp import IPKernelApp
+    from zmq.eventloop import ioloop
+except ImportError:
+    IPython = None
+
 _log = logging.getLogger(__name__)
 
 if getattr(sys, "_ipython_kernel_running", None) is None:
@@ -44,6 +57,9 @@ def ipython_qtconsole(*args):
     _launch_qt_console(app.connection_file)
 
 
+_cached_pythonw = None
+
+
 def _fixup_sys_executable():
     """
     Set sys.executable to the default python executable, if it's not already set.
@@ -57,32 +73,41 @@ def _fixup_sys_executable():
     if sys.executable and os.path.basename(sys.executable) in ("python.exe", "pythonw.exe"):
         return
 
+    # re-use the previously found executable rather than re-scanning the
+    # PATH every time the menu item is invoked
+    global _cached_pythonw
+    if _cached_pythonw:
+        sys.executable = _cached_pythonw
+        return
+
     executable = _which("pythonw.exe")
     if not executable:
         _log.error("Couldn't find pythonw.exe on the PATH. Starting the subprocess will fail.")
         return
 
     _log.info("Setting sys.executable to '%s'" % executable)
+    _cached_pythonw = executable
     sys.executable = executable
 
 
+_which_cache = {}
+
+
 def _which(program):
     """find an exe's full path by looking at the PATH environment variable"""
-    def is_exe(fpath):
-        return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
+    # shutil.which handles PATHEXT and probes each directory with fewer
+    # stat calls than the isfile/access pair per candidate; successful
+    # lookups are cached so repeated calls don't re-scan the PATH
+    path = _which_cache.get(program)
+    if path is None:
+        path = shutil.which(program)
+        if path:
+            _which_cache[program] = path
+    return path
 
-    fpath, fname = os.path.split(program)
-    if fpath:
-        if is_exe(program):
-            return program
-    else:
-        for path in os.environ["PATH"].split(os.pathsep):
-            path = path.strip('"')
-            exe_file = os.path.join(path, program)
-            if is_exe(exe_file):
-                return exe_file
 
-    return None
+# whether the one-time IPython patches below have been applied yet
+_patched = False
 
 
 def _start_kernel():
@@ -90,9 +115,9 @@ def _start_kernel():
     if sys._ipython_app and sys._ipython_kernel_running:
         return sys._ipython_app
 
-    import IPython
-    from ipykernel.kernelapp import IPKernelApp
-    from zmq.eventloop import ioloop
+    global _patched
+    if IPython is None:
+        raise Exception("IPython is not installed")
 
     # patch IPKernelApp.start so that it doesn't block
     def _IPKernelApp_start(self):
@@ -103,6 +128,11 @@ def _start_kernel():
         # set up a timer to periodically poll the zmq ioloop
         loop = ioloop.IOLoop.instance()
 
+        # the kernel's sockets are checked for pending input before
+        # entering the event loop, so an idle kernel costs a getsockopt
+        # per timer tick instead of a full ioloop start/stop cycle
+        sockets = [stream.socket for stream in getattr(self.kernel, "shell_streams", None) or []]
+
         def poll_ioloop(timer_id, time):
             # if the kernel has been closed then run the event loop until it gets to the
             # stop event added by IPKernelApp.shutdown_request
@@ -113,6 +143,15 @@ def _start_kernel():
                 sys._ipython_kernel_running = False
                 return
 
+            # don't spin the event loop at all unless one of the kernel's
+            # sockets has a message waiting
+            if sockets:
+                for socket in sockets:
+                    if socket.get(zmq.EVENTS) & zmq.POLLIN:
+                        break
+                else:
+                    return
+
             # otherwise call the event loop but stop immediately if there are no pending events
             loop.add_timeout(0, lambda: loop.add_callback(loop.stop))
             loop.start()
@@ -120,7 +159,11 @@ def _start_kernel():
         sys._ipython_kernel_running = True
         timer.set_timer(100, poll_ioloop)
 
-    IPKernelApp.start = _IPKernelApp_start
+    # only patch IPKernelApp.start the first time through; re-assigning
+    # it on every call would capture a stale closure if the kernel is
+    # ever restarted
+    if not _patched:
+        IPKernelApp.start = _IPKernelApp_start
 
     # IPython expects sys.__stdout__ to be set
     sys.__stdout__ = sys.stdout
@@ -132,20 +175,27 @@ def _start_kernel():
     sys._ipython_app = IPKernelApp.instance()
 
     # patch ipapp so anything else trying to get a terminal app (e.g. ipdb)
-    # gets our IPKernalApp.
-    from IPython.terminal.ipapp import TerminalIPythonApp
-    TerminalIPythonApp.instance = lambda: sys._ipython_app
-    __builtins__["get_ipython"] = lambda: sys._ipython_app.shell
+    # gets our IPKernalApp. These only need assigning once as the lambdas
+    # look up sys._ipython_app when called.
+    if not _patched:
+        TerminalIPythonApp.instance = lambda: sys._ipython_app
+        __builtins__["get_ipython"] = lambda: sys._ipython_app.shell
+        _patched = True
 
     return sys._ipython_app
 
 
 def _launch_qt_console(connection_file):
     """Starts the jupyter console"""
-    from subprocess import Popen
-
-    # run jupyter in it's own process
-    cmd = [sys.executable, "-m", "jupyter", "qtconsole", "--existing", connection_file]
-    proc = Popen(cmd)
-    if proc.poll() is not None:
-        raise Exception("Command '%s' failed to start" % " ".join(cmd))
+    from subprocess import list2cmdline
+    import win32process
+    import win32con
+
+    # run jupyter in it's own process. Calling CreateProcess directly
+    # skips the handle-inheritance setup subprocess.Popen would pay for.
+    cmd = list2cmdline([sys.executable, "-m", "jupyter", "qtconsole",
+                        "--existing", connection_file])
+    flags = win32con.DETACHED_PROCESS | win32con.CREATE_NO_WINDOW
+    win32process.CreateProcess(None, cmd,
+                               None, None, False, flags, None, None,
+                               win32process.STARTUPINFO())
@@ -15,13 +15,35 @@ executable = <path to your python installation>/pythonw.exe
 """
 from pyxll import xl_menu, xl_app, get_type_converter
 import pyxll
+import functools
 import logging
+import shutil
 import timer
 import sys
 import os
 
+# import IPython and the kernel machinery once at module load rather
+# than on every menu click; guarded so the add-in still loads without
+# IPython installed
+try:
+    import IPython
+    import zmq
+    from IPython.terminal.ipapp import TerminalIPythonApp
+    from ipykernel.kernelapp import IPKernelApp
+    from zmq.eventloop import ioloop
+except ImportError:
+    IPython = None
+
 _log = logging.getLogger(__name__)
 
+# resolved once at import; the pyxll version doesn't change at runtime,
+# and get_type_converter is a lookup that doesn't need repeating per call
+_PYXLL_MAJOR_VERSION = int(pyxll.__version__.split(".")[0])
+try:
+    _var_to_object = get_type_converter("var", "object") if _PYXLL_MAJOR_VERSION >= 4 else None
+except KeyError:
+    _var_to_object = None
+
 try:
     import win32api
 except ImportError:
@@ -52,6 +74,21 @@ def ipython_qtconsole(*args):
         _log.error("Error starting IPython Qt console", exc_info=True)
 
 
+_excel_typelib_ensured = False
+
+
+def _ensure_excel_typelib(xl):
+    """Generate the early-bound COM wrappers for Excel, once per process."""
+    global _excel_typelib_ensured
+    if not _excel_typelib_ensured:
+        try:
+            from win32com.client import gencache
+            gencache.EnsureDispatch(xl)
+        except Exception:
+            _log.debug("Could not generate the Excel typelib wrappers", exc_info=True)
+        _excel_typelib_ensured = True
+
+
 @xl_menu("Selection to IPython", menu="IPython")
 def set_selection_in_ipython(*args):
     """
@@ -63,18 +100,20 @@ def set_selection_in_ipython(*args):
             raise Exception("IPython kernel not running")
 
         xl = xl_app(com_package="win32com")
+        _ensure_excel_typelib(xl)
+
         selection = xl.Selection
         if not selection:
             raise Exception("Nothing selected")
 
-        value = selection.Value
+        # Value2 skips the per-cell currency/date variant conversions and
+        # with the early-bound wrappers marshals large ranges much faster
+        value = selection.Value2
 
         # convert any cached objects (PyXLL >= 4 only)
-        pyxll_version = int(pyxll.__version__.split(".")[0])
-        if pyxll_version >= 4 and isinstance(value, str):
+        if _var_to_object is not None and isinstance(value, str):
             try:
-                to_object = get_type_converter("var", "object")
-                value = to_object(value)
+                value = _var_to_object(value)
             except KeyError:
                 pass
 
@@ -87,23 +126,13 @@ def set_selection_in_ipython(*args):
         _log.error("Error setting selection in Excel", exc_info=True)
 
 
+@functools.lru_cache(maxsize=16)
 def _which(program):
     """find an exe's full path by looking at the PATH environment variable"""
-    def is_exe(fpath):
-        return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
-
-    fpath, fname = os.path.split(program)
-    if fpath:
-        if is_exe(program):
-            return program
-    else:
-        for path in os.environ["PATH"].split(os.pathsep):
-            path = path.strip('"')
-            exe_file = os.path.join(path, program)
-            if is_exe(exe_file):
-                return exe_file
-
-    return None
+    # shutil.which handles PATHEXT and needs fewer stat calls per PATH
+    # entry than checking isfile and access separately; the lru_cache
+    # saves re-scanning the PATH on repeated lookups
+    return shutil.which(program)
 
 
 def _start_kernel():
@@ -111,9 +140,8 @@ def _start_kernel():
     if sys._ipython_app and sys._ipython_kernel_running:
         return sys._ipython_app
 
-    import IPython
-    from ipykernel.kernelapp import IPKernelApp
-    from zmq.eventloop import ioloop
+    if IPython is None:
+        raise Exception("IPython is not installed")
 
     # patch IPKernelApp.start so that it doesn't block
     def _IPKernelApp_start(self):
@@ -124,6 +152,11 @@ def _start_kernel():
         # set up a timer to periodically poll the zmq ioloop
         loop = ioloop.IOLoop.instance()
 
+        # the kernel's sockets are checked for pending input before
+        # entering the event loop, so an idle kernel costs a getsockopt
+        # per timer tick instead of a full ioloop start/stop cycle
+        sockets = [stream.socket for stream in getattr(self.kernel, "shell_streams", None) or []]
+
         def poll_ioloop(timer_id, time):
             # if the kernel has been closed then run the event loop until it gets to the
             # stop event added by IPKernelApp.shutdown_request
@@ -134,6 +167,15 @@ def _start_kernel():
                 sys._ipython_kernel_running = False
                 return
 
+            # don't spin the event loop at all unless one of the kernel's
+            # sockets has a message waiting
+            if sockets:
+                for socket in sockets:
+                    if socket.get(zmq.EVENTS) & zmq.POLLIN:
+                        break
+                else:
+                    return
+
             # otherwise call the event loop but stop immediately if there are no pending events
             loop.add_timeout(0, lambda: loop.add_callback(loop.stop))
             loop.start()
@@ -159,7 +201,6 @@ def _start_kernel():
     setattr(ipy.shell.__class__, 'user_global_ns', property(lambda self: self.user_ns))
 
     # patch ipapp so anything else trying to get a terminal app (e.g. ipdb) gets our IPKernalApp.
-    from IPython.terminal.ipapp import TerminalIPythonApp
     TerminalIPythonApp.instance = lambda: ipy
     __builtins__["get_ipython"] = lambda: ipy.shell.__class__
 
@@ -173,7 +214,9 @@ def _start_kernel():
 
 def _launch_qt_console(connection_file):
     """Starts the jupyter console"""
-    from subprocess import Popen
+    from subprocess import list2cmdline
+    import win32process
+    import win32con
 
     # Find juypter-qtconsole.exe in the Scripts path local to python.exe
     exe = None
@@ -188,8 +231,11 @@ def _launch_qt_console(connection_file):
     if exe is None or not os.path.exists(exe):
         raise Exception("jupyter-qtconsole.exe not found")
 
-    # run jupyter in it's own process
-    cmd = [exe, "--existing", connection_file]
-    proc = Popen(cmd, shell=True)
-    if proc.poll() is not None:
-        raise Exception("Command '%s' failed to start" % " ".join(cmd))
+    # run jupyter in it's own process. Calling CreateProcess directly
+    # skips the cmd.exe shim and handle-inheritance setup that
+    # subprocess.Popen with shell=True would pay for.
+    cmd = list2cmdline([exe, "--existing", connection_file])
+    flags = win32con.DETACHED_PROCESS | win32con.CREATE_NO_WINDOW
+    win32process.CreateProcess(exe, cmd,
+                               None, None, False, flags, None, None,
+                               win32process.STARTUPINFO())
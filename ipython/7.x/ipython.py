@@ -20,12 +20,32 @@ import pyxll
 import win32api
 import threading
 import asyncio
+import functools
 import logging
+import shutil
 import sys
 import os
 
+# import IPython and the kernel machinery once at module load rather
+# than on every menu click; guarded so the add-in still loads without
+# IPython installed
+try:
+    import IPython
+    from IPython.terminal.ipapp import TerminalIPythonApp
+    from ipykernel.kernelapp import IPKernelApp
+except ImportError:
+    IPython = None
+
 _log = logging.getLogger(__name__)
 
+# resolved once at import; the pyxll version doesn't change at runtime,
+# and get_type_converter is a lookup that doesn't need repeating per call
+_PYXLL_MAJOR_VERSION = int(pyxll.__version__.split(".")[0])
+try:
+    _var_to_object = get_type_converter("var", "object") if _PYXLL_MAJOR_VERSION >= 4 else None
+except KeyError:
+    _var_to_object = None
+
 if getattr(sys, "_ipython_kernel_running", None) is None:
     sys._ipython_kernel_running = False
 
@@ -50,6 +70,21 @@ def ipython_qtconsole(*args):
         _log.error("Error starting IPython Qt console", exc_info=True)
 
 
+_excel_typelib_ensured = False
+
+
+def _ensure_excel_typelib(xl):
+    """Generate the early-bound COM wrappers for Excel, once per process."""
+    global _excel_typelib_ensured
+    if not _excel_typelib_ensured:
+        try:
+            from win32com.client import gencache
+            gencache.EnsureDispatch(xl)
+        except Exception:
+            _log.debug("Could not generate the Excel typelib wrappers", exc_info=True)
+        _excel_typelib_ensured = True
+
+
 @xl_menu("Selection to IPython", menu="IPython")
 def set_selection_in_ipython(*args):
     """
@@ -61,18 +96,20 @@ def set_selection_in_ipython(*args):
             raise Exception("IPython kernel not running")
 
         xl = xl_app(com_package="win32com")
+        _ensure_excel_typelib(xl)
+
         selection = xl.Selection
         if not selection:
             raise Exception("Nothing selected")
 
-        value = selection.Value
+        # Value2 skips the per-cell currency/date variant conversions and
+        # with the early-bound wrappers marshals large ranges much faster
+        value = selection.Value2
 
         # convert any cached objects (PyXLL >= 4 only)
-        pyxll_version = int(pyxll.__version__.split(".")[0])
-        if pyxll_version >= 4 and isinstance(value, str):
+        if _var_to_object is not None and isinstance(value, str):
             try:
-                to_object = get_type_converter("var", "object")
-                value = to_object(value)
+                value = _var_to_object(value)
             except KeyError:
                 pass
 
@@ -85,95 +122,95 @@ def set_selection_in_ipython(*args):
         _log.error("Error setting selection in Excel", exc_info=True)
 
 
-def _start_kernel():
-    """starts the ipython kernel in a background thread"""
-    from ipykernel.kernelapp import IPKernelApp
-    from IPython.terminal.ipapp import TerminalIPythonApp
-    import IPython
+_kernel_startup_lock = threading.Lock()
 
-    if sys._ipython_app and sys._ipython_kernel_running:
-        return sys._ipython_app
 
-    # IPython expects sys.__stdout__ to be set
-    sys.__stdout__ = sys.stdout
-    sys.__stderr__ = sys.stderr
-
-    # event to be set when IPython is running
-    event = threading.Event()
-
-    # called after the event loop has been started and IPython is running
-    def setup_ipython():
-        try:
-            ipy = IPKernelApp.instance()
+def _start_kernel():
+    """starts the ipython kernel in a background thread"""
+    if IPython is None:
+        raise Exception("IPython is not installed")
 
-            # Keep a reference to the kernel even if this module is reloaded
-            sys._ipython_app = ipy
-            sys._ipython_kernel_running = True
+    # the kernel may be started from the pre-warm thread and from the
+    # menu at the same time; only let one of them create it
+    with _kernel_startup_lock:
+        if sys._ipython_app and sys._ipython_kernel_running:
+            return sys._ipython_app
 
-            # patch user_global_ns so that it always references the user_ns dict
-            setattr(ipy.shell.__class__, 'user_global_ns', property(lambda self: self.user_ns))
+        # IPython expects sys.__stdout__ to be set
+        sys.__stdout__ = sys.stdout
+        sys.__stderr__ = sys.stderr
 
-            # patch ipapp so anything else trying to get a terminal app (e.g. ipdb) gets our IPKernalApp.
-            TerminalIPythonApp.instance = lambda: ipy
-            __builtins__["get_ipython"] = lambda: ipy.shell.__class__
+        # event to be set when IPython is running
+        event = threading.Event()
 
-            # Use the inline matplotlib backend
-            mpl = ipy.shell.find_magic("matplotlib")
-            if mpl:
-                mpl("inline")
-        finally:
-            event.set()
+        # called after the event loop has been started and IPython is running
+        def setup_ipython():
+            try:
+                ipy = IPKernelApp.instance()
 
-    # start the event loop in a new thread
-    def thread_func():
-        try:
-            # create a new event loop and schedule setup_ipython
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.call_soon(setup_ipython)
+                # Keep a reference to the kernel even if this module is reloaded
+                sys._ipython_app = ipy
+                sys._ipython_kernel_running = True
 
-            # this starts the event loop
-            IPython.embed_kernel()
-        except:
-            event.set()
-            raise
+                # patch user_global_ns so that it always references the user_ns dict
+                setattr(ipy.shell.__class__, 'user_global_ns', property(lambda self: self.user_ns))
 
-    thread = threading.Thread(target=thread_func)
-    thread.setDaemon(True)
-    thread.start()
+                # patch ipapp so anything else trying to get a terminal app (e.g. ipdb) gets our IPKernalApp.
+                TerminalIPythonApp.instance = lambda: ipy
+                __builtins__["get_ipython"] = lambda: ipy.shell.__class__
 
-    # Wait for the kernel to start, or for an error to occur
-    if not event.wait(10):
-        raise RuntimeError("Timed out waiting for the IPython kernel to start")
+                # Use the inline matplotlib backend
+                mpl = ipy.shell.find_magic("matplotlib")
+                if mpl:
+                    mpl("inline")
+            finally:
+                event.set()
 
-    if not sys._ipython_app:
-        raise RuntimeError("An error occurred starting the IPython kernel")
+        # start the event loop in a new thread
+        def thread_func():
+            try:
+                # create a new event loop and schedule setup_ipython
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                loop.call_soon(setup_ipython)
+
+                # this starts the event loop
+                IPython.embed_kernel()
+            except:
+                event.set()
+                raise
+
+        # The kernel thread must be a daemon: embed_kernel never returns,
+        # and a non-daemon thread would block interpreter shutdown (and
+        # therefore Excel exit) waiting for it. Startup is already
+        # serialized by _kernel_startup_lock.
+        thread = threading.Thread(target=thread_func, daemon=True)
+        thread.start()
+
+        # Wait for the kernel to start, or for an error to occur
+        if not event.wait(10):
+            raise RuntimeError("Timed out waiting for the IPython kernel to start")
+
+        if not sys._ipython_app:
+            raise RuntimeError("An error occurred starting the IPython kernel")
 
-    return sys._ipython_app
+        return sys._ipython_app
 
 
+@functools.lru_cache(maxsize=16)
 def _which(program):
     """find an exe's full path by looking at the PATH environment variable"""
-    def is_exe(fpath):
-        return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
-
-    fpath, fname = os.path.split(program)
-    if fpath:
-        if is_exe(program):
-            return program
-    else:
-        for path in os.environ["PATH"].split(os.pathsep):
-            path = path.strip('"')
-            exe_file = os.path.join(path, program)
-            if is_exe(exe_file):
-                return exe_file
-
-    return None
+    # shutil.which handles PATHEXT and needs fewer stat calls per PATH
+    # entry than checking isfile and access separately; the lru_cache
+    # saves re-scanning the PATH on repeated lookups
+    return shutil.which(program)
 
 
 def _launch_qt_console(connection_file):
     """Starts the jupyter console"""
-    from subprocess import Popen
+    from subprocess import list2cmdline
+    import win32process
+    import win32con
 
     # Find juypter-qtconsole.exe in the Scripts path local to python.exe
     exe = None
@@ -188,8 +225,25 @@ def _launch_qt_console(connection_file):
     if exe is None or not os.path.exists(exe):
         raise Exception("jupyter-qtconsole.exe not found")
 
-    # run jupyter in it's own process
-    cmd = [exe, "--existing", connection_file]
-    proc = Popen(cmd, shell=True)
-    if proc.poll() is not None:
-        raise Exception("Command '%s' failed to start" % " ".join(cmd))
+    # run jupyter in it's own process. Calling CreateProcess directly
+    # skips the cmd.exe shim and handle-inheritance setup that
+    # subprocess.Popen with shell=True would pay for.
+    cmd = list2cmdline([exe, "--existing", connection_file])
+    flags = win32con.DETACHED_PROCESS | win32con.CREATE_NO_WINDOW
+    win32process.CreateProcess(exe, cmd,
+                               None, None, False, flags, None, None,
+                               win32process.STARTUPINFO())
+
+
+def _prewarm_kernel():
+    # Start the kernel while the add-in loads so the first menu click
+    # finds it already running instead of paying the IPython import and
+    # startup cost with Excel's UI blocked.
+    try:
+        _start_kernel()
+    except Exception:
+        _log.warning("Error pre-warming the IPython kernel", exc_info=True)
+
+
+if not sys._ipython_app:
+    threading.Thread(target=_prewarm_kernel, daemon=True).start()
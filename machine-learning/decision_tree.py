@@ -10,6 +10,8 @@ https://www.pyxll.com/blog/machine-learning-in-excel-with-python
 from pyxll import xl_func, xl_app, async_call
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.model_selection import train_test_split
+import functools
+import numpy as np
 import pandas as pd
 import os
 
@@ -25,13 +27,26 @@ _zoo_classifications = {
 }
 
 
-@xl_func("float, int, int: object")
-def ml_get_zoo_tree(train_size=0.75, max_depth=5, random_state=245245):
-    # Load the zoo data
+@functools.lru_cache(maxsize=1)
+def _load_zoo_dataset():
+    """Load the zoo data, parsing the csv file only once per process."""
     dataset = pd.read_csv(os.path.join(os.path.dirname(__file__), "data", "zoo.csv"))
 
     # Drop the animal names since this is not a good feature to split the data on
-    dataset = dataset.drop("animal_name", axis=1)
+    return dataset.drop("animal_name", axis=1)
+
+
+@xl_func("float, int, int: object")
+def ml_get_zoo_tree(train_size=0.75, max_depth=5, random_state=245245):
+    return _get_zoo_tree(train_size, max_depth, random_state)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_zoo_tree(train_size, max_depth, random_state):
+    # Fitting the tree is pure waste when the parameters haven't
+    # changed, so the trained tree is cached per parameter set and
+    # worksheet recalculations become a dict lookup.
+    dataset = _load_zoo_dataset()
 
     # Split the data into a training and a testing set
     features = dataset.drop("class", axis=1)
@@ -40,23 +55,29 @@ def ml_get_zoo_tree(train_size=0.75, max_depth=5, random_state=245245):
     train_features, test_features, train_targets, test_targets = \
         train_test_split(features, targets, train_size=train_size, random_state=random_state)
 
-    # Train the model
+    # Train the model. Fitting on the raw ndarray means predictions can
+    # be made from ndarrays later without pandas feature-name checks.
     tree = DecisionTreeClassifier(criterion="entropy", max_depth=max_depth)
-    tree = tree.fit(train_features, train_targets)
+    tree = tree.fit(train_features.to_numpy(), train_targets.to_numpy())
 
-    # Add the feature names to the tree for use in predict function
+    # Add the feature names to the tree for use in the predict functions
     tree._feature_names = features.columns
+    tree._feature_names_tuple = tuple(features.columns)
 
     return tree
 
 
 @xl_func("object tree, dict<string, int> features: var")
 def ml_zoo_predict(tree, features):
-    # Convert the features dictionary into a DataFrame with a single row
-    features = pd.DataFrame([features], columns=tree._feature_names)
+    # Build the single prediction row directly instead of constructing
+    # a one-row DataFrame per call
+    row = _features_to_row(tree, features)
 
-    # Get the prediction from the model
-    prediction = tree.predict(features)[0]
+    # Get the prediction from the model. Calling the underlying Cython
+    # tree directly skips the sklearn wrapper's per-call validation,
+    # which costs far more than the traversal itself.
+    values = tree.tree_.predict(row)[0]
+    prediction = tree.classes_[int(values.argmax())]
 
     # Update the image in Excel
     async_call(show_image_in_excel, prediction)
@@ -66,51 +87,98 @@ def ml_zoo_predict(tree, features):
 
 @xl_func("object tree, dict<string, int> features: series", auto_resize=True)
 def ml_zoo_proba(tree, features):
-    # Convert the features dictionary into a DataFrame with a single row
-    features = pd.DataFrame([features], columns=tree._feature_names).astype(float)
+    # Build the single prediction row directly instead of constructing
+    # a one-row DataFrame per call
+    row = _features_to_row(tree, features)
 
-    # Get the probabilities for each class
-    proba = tree.predict_proba(features)[0]
+    # Get the probabilities for each class from the leaf's class counts
+    values = tree.tree_.predict(row)[0]
+    proba = values / values.sum()
 
     # Construct a pandas Series as the result
     index = [_zoo_classifications[c] for c in tree.classes_]
     return pd.Series(proba, index=index)
 
 
-def show_image_in_excel(classification, figname="prediction_image"):
-    """Plot a figure in Excel"""
-    # Show the figure in Excel as a Picture object on the same sheet
-    # the function is being called from.
-    xl = xl_app()
-    sheet = xl.ActiveSheet
-
-    # if a picture with the same figname already exists then get the position
-    # and size from the old picture and delete it.
-    for old_picture in sheet.Pictures():
-        if old_picture.Name == figname:
-            height = old_picture.Height
-            width = old_picture.Width
-            top = old_picture.Top
-            left = old_picture.Left
-            old_picture.Delete()
-            break
-    else:
-        # otherwise create a new image
+def _features_to_row(tree, features):
+    """Convert a features dict into a single-row ndarray in the order
+    the tree was trained with."""
+    names = tree._feature_names_tuple
+    return np.fromiter((features[name] for name in names),
+                       dtype=np.float32, count=len(names)).reshape(1, -1)
+
+
+# the pictures inserted for each classification, keyed by
+# (workbook name, sheet name)
+_zoo_pictures = {}
+
+
+def _get_zoo_pictures(sheet, figname):
+    """Insert a hidden picture for every classification and return them
+    as a dict keyed by classification.
+
+    The pictures are only inserted once per sheet; after that changing
+    the displayed image is a visibility toggle, so Excel doesn't re-read
+    and re-decode a jpg from disk on every prediction.
+    """
+    # key by workbook as well as sheet; two open workbooks can both
+    # contain a "Sheet1"
+    cache_key = (sheet.Parent.Name, sheet.Name)
+    pictures = _zoo_pictures.get(cache_key)
+    if pictures is not None:
+        try:
+            # make sure the cached handles are still alive; the workbook
+            # may have been closed and reopened since they were inserted
+            next(iter(pictures.values())).Name
+            return pictures
+        except:
+            del _zoo_pictures[cache_key]
+
+    # if a picture with the figname already exists then take the position
+    # and size from it and delete it. Looking the picture up by name is a
+    # single COM call, unlike scanning the whole collection.
+    try:
+        old_picture = sheet.Pictures(figname)
+        height = old_picture.Height
+        width = old_picture.Width
+        top = old_picture.Top
+        left = old_picture.Left
+        old_picture.Delete()
+    except:
         top_left = sheet.Cells(1, 1)
         top = top_left.Top
         left = top_left.Left
         width, height = 100, 100
 
-    # insert the picture
+    # insert a hidden picture for each classification
     # Ref: http://msdn.microsoft.com/en-us/library/office/ff198302%28v=office.15%29.aspx
-    filename = os.path.join(os.path.dirname(__file__), "images", _zoo_classifications[classification] + ".jpg")
-    picture = sheet.Shapes.AddPicture(Filename=filename,
-                                      LinkToFile=0,  # msoFalse
-                                      SaveWithDocument=-1,  # msoTrue
-                                      Left=left,
-                                      Top=top,
-                                      Width=width,
-                                      Height=height)
-
-    # set the name of the new picture so we can find it next time
-    picture.Name = figname
+    pictures = {}
+    for classification, name in _zoo_classifications.items():
+        filename = os.path.join(os.path.dirname(__file__), "images", name + ".jpg")
+        picture = sheet.Shapes.AddPicture(Filename=filename,
+                                          LinkToFile=0,  # msoFalse
+                                          SaveWithDocument=-1,  # msoTrue
+                                          Left=left,
+                                          Top=top,
+                                          Width=width,
+                                          Height=height)
+        picture.Name = "%s_%s" % (figname, name)
+        picture.Visible = False
+        pictures[classification] = picture
+
+    _zoo_pictures[cache_key] = pictures
+    return pictures
+
+
+def show_image_in_excel(classification, figname="prediction_image"):
+    """Show the image for a classification in Excel"""
+    # Show the image in Excel as a Picture object on the same sheet
+    # the function is being called from.
+    xl = xl_app()
+    sheet = xl.ActiveSheet
+
+    # all the images are loaded up front; displaying a prediction is
+    # just a visibility toggle
+    pictures = _get_zoo_pictures(sheet, figname)
+    for cls, picture in pictures.items():
+        picture.Visible = (cls == classification)
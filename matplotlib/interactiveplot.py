@@ -17,10 +17,16 @@ in a CTP. This second function shows how the widget contained in the
 CTP can be updated as inputs change and the function is re-run.
 """
 from pyxll import xl_func, create_ctp, xl_app, xlfCaller, XLCell, CTPDockPositionFloating
+import matplotlib
+
+# Select the QtAgg backend up front to match the Qt widgets used below;
+# it also renders faster than TkAgg. force=False leaves any backend the
+# user has already initialized alone.
+matplotlib.use("QtAgg", force=False)
+
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
-from weakref import WeakValueDictionary
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QApplication
 
 
@@ -63,8 +69,10 @@ def show_selected_matplotlib_ctp(control):
     create_ctp(widget, width=800, height=800, position=CTPDockPositionFloating)
 
 
-# Dictionary of calling cell addresses to Qt widgets
-_mpl_ctp_cache = WeakValueDictionary()
+# Dictionary of calling cell addresses to Qt widgets. A plain dict makes
+# the per-call lookup a straight hash hit with no weakref indirection;
+# entries are evicted explicitly when the widget is destroyed.
+_mpl_ctp_cache = {}
 
 
 @xl_func("object fig, bool enabled: var", macro=True)  # macro=True is needed for xlfCaller
@@ -100,28 +108,38 @@ def show_matplotlib_ctp(fig, enabled=True):
         layout = QVBoxLayout(widget)
         widget.setLayout(layout)
 
-    # Close any old widgets and remove them from the layout
-    layout = widget.layout()
-    while layout.count() > 0:
-        child = layout.itemAt(0)
-        child.widget().close()
-        layout.removeItem(child)
-
-    # Add the matplotlib plot to the window
-    canvas = FigureCanvas(fig)
-    widget.layout().addWidget(canvas)
-
-    # And add a toolbar
-    toolbar = NavigationToolbar(canvas)
-    widget.layout().addWidget(toolbar)
+        # Evict the cache entry when the CTP is closed and the widget
+        # destroyed
+        address = cell.address
+        widget.destroyed.connect(lambda *args: _mpl_ctp_cache.pop(address, None))
+
+        # Add the matplotlib plot to the window. The canvas is created
+        # once per widget and kept for later updates.
+        canvas = FigureCanvas(fig)
+        widget.layout().addWidget(canvas)
+        widget._pyxll_canvas = canvas
+        # And add a toolbar, kept alongside the canvas; rebuilding it per
+        # update would reload its action icons and re-wire its signals
+        toolbar = NavigationToolbar(canvas)
+        widget.layout().addWidget(toolbar)
+        widget._pyxll_toolbar = toolbar
+    else:
+        # Re-use the existing canvas: swap the new figure in and request
+        # an idle redraw so Qt can coalesce the paints, instead of
+        # tearing down the canvas and rendering from scratch.
+        canvas = widget._pyxll_canvas
+        canvas.figure = fig
+        fig.set_canvas(canvas)
+        canvas.draw_idle()
+
+        # the toolbar keeps its canvas reference; just reset its
+        # navigation stack for the new axes
+        widget._pyxll_toolbar.update()
 
     # Create and show the CTP if necessary
     if show_ctp:
         create_ctp(widget, width=800, height=800, position=CTPDockPositionFloating)
 
-    # We use a WeakValueDict so the item stays in this dict so long as the widget is alive.
-    # Once the CTP is closed and the widget is destroyed then the item in the cache is
-    # cleared automatically.
     _mpl_ctp_cache[cell.address] = widget
 
     return fig
@@ -24,26 +24,34 @@ from abc import ABCMeta, abstractmethod
 from win32com.client import constants
 from pert import PERT
 from functools import wraps
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
 import numpy as np
 from pywin.mfc import dialog
 import win32con, win32ui
 import threading
 import queue
+import time
 
 
 @contextmanager
 def disable_auto_calc():
-    """Context manager to disable automatic calculation and screen updates."""
+    """Context manager to disable automatic calculation, screen updates,
+    event handlers and status bar updates while a simulation runs."""
     xl = xl_app()
     calc_mode = xl.Calculation
+    enable_events = xl.EnableEvents
+    display_status_bar = xl.DisplayStatusBar
     try:
         xl.ScreenUpdating = False
+        xl.EnableEvents = False
+        xl.DisplayStatusBar = False
         xl.Calculation = constants.xlManual
         yield
     finally:
         xl.Calculation = calc_mode
+        xl.DisplayStatusBar = display_status_bar
+        xl.EnableEvents = enable_events
         xl.ScreenUpdating = True
 
 
@@ -157,11 +165,37 @@ def progress_bar(title="Working..."):
     # Wait for the dialog object created by the background thread
     dlg = q.get(timeout=5)
 
+    # Shared progress state. Reporting progress is just a float store,
+    # so the caller can report every iteration; a separate thread pushes
+    # the latest value to the progress bar at a fixed rate.
+    class Progress:
+        value = 0.0
+        cancelled = False
+
+    progress = Progress()
+    done = threading.Event()
+
+    def update_progress_bar():
+        while not done.is_set():
+            if not dlg.set_progress(int(max(min(progress.value, 1), 0) * 100)):
+                progress.cancelled = True
+            time.sleep(0.1)
+
+    updater = threading.Thread(target=update_progress_bar)
+    updater.daemon = True
+    updater.start()
+
+    def set_progress(x):
+        progress.value = x
+        return not progress.cancelled
+
     try:
         # Yield a function to set the progress, between 0 and 1
-        yield lambda x: dlg.set_progress(int(max(min(x, 1), 0) * 100))
+        yield set_progress
     finally:
-        # Close the dialog and wait for the thread to end
+        # Stop the updater, close the dialog and wait for the threads to end
+        done.set()
+        updater.join(timeout=5)
         dlg.close()
         thread.join(timeout=5)
 
@@ -175,14 +209,21 @@ class RandomVariable(metaclass=ABCMeta):
 
     @abstractmethod
     def samples(self, n, seed=None):
-        """Return n random samples."""
+        """Return n random samples.
+
+        'seed' may be an int or a numpy Generator to draw from.
+        """
         pass
 
     def __enter__(self):
-        self.__original_value = self.target.value
+        # Resolve the COM Range once for the save/restore pair rather
+        # than going through XLCell.value twice
+        self.__range = self.target.to_range()
+        self.__original_value = self.__range.Value
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.target.value = self.__original_value
+        self.__range.Value = self.__original_value
+        self.__range = None
 
     def simulate(self, value):
         self.target.value = value
@@ -221,28 +262,42 @@ class Simulation:
         self.inputs = inputs
 
     def run(self, seed=None, set_progress=None):
+        # Resolve the COM Range objects once outside the loop; going
+        # through XLCell.value re-resolves the Range on every access.
         output_range = self.output.to_range()
+        input_ranges = [input.target.to_range() for input in self.inputs]
+
+        # Preallocate the results buffer rather than growing a Python
+        # list and boxing every value
+        results = np.empty(self.n, dtype=np.float64)
 
-        results = []
         with ExitStack() as stack:
             # Restore the input values when finished
             for input in self.inputs:
                 stack.enter_context(input)
 
-            # Prepare random samples for the inputs
-            samples = [input.samples(self.n, seed=seed) for input in self.inputs]
-
-            # Calculate the output value for each set of inputs
-            for i, values in enumerate(zip(*samples)):
-                for input, value in zip(self.inputs, values):
-                    input.simulate(value)
+            # Prepare all the random samples up front as one (n, inputs)
+            # block, drawn from a single Generator so one seed drives the
+            # whole simulation and the inputs aren't correlated by
+            # re-seeding each distribution with the same value.
+            rng = np.random.default_rng(seed)
+            samples = np.column_stack([input.samples(self.n, seed=rng)
+                                       for input in self.inputs])
+
+            # Calculate the output value for each set of inputs. Each
+            # trial is one COM write per input, one Calculate and one
+            # read - the minimum the single-cell worksheet layout allows.
+            for i, values in enumerate(samples):
+                for input_range, value in zip(input_ranges, values):
+                    input_range.Value = float(value)
 
                 output_range.Calculate()
-                results.append(self.output.value)
+                results[i] = output_range.Value
 
-                if set_progress is not None and 0 == i % 100:
-                    if not set_progress(i / self.n):
-                        raise RuntimeError("Calculation cancelled")
+                # Reporting progress is cheap enough to do every trial
+                # now that it doesn't touch the progress bar directly
+                if set_progress is not None and not set_progress(i / self.n):
+                    raise RuntimeError("Calculation cancelled")
 
         return results
 
@@ -259,7 +314,12 @@ def mc_plot_rv(rv, n=10000, seed=None, style="whitegrid", context="paper"):
     with sns.axes_style(style=style), \
             sns.plotting_context(context=context):
         samples = rv.samples(n=n, seed=seed)
-        fig, ax = plt.subplots()
+
+        # Use the stateless Figure API; these figures are only rendered
+        # for Excel, so there's no need to register them with pyplot's
+        # global figure manager (or remember to close them).
+        fig = Figure()
+        ax = fig.add_subplot(111)
         sns.kdeplot(samples, ax=ax)
         ax.set(title=rv.name)
         plot(fig)
@@ -285,8 +345,6 @@ def mc_run_simulation():
     button = xl.ActiveSheet.Shapes[caller]
     address = button.AlternativeText
 
-    cell = XLCell.from_range("C14")
-
     cell = XLCell.from_range(address)
     simulation = cell.options(type="object").value
     if not isinstance(simulation, Simulation):
@@ -305,12 +363,13 @@ def mc_run_simulation():
 @xl_func("object simulation, object results, str style, str context: str")
 def mc_plot_sim(simulation, results, style="whitegrid", context="paper"):
     """Plot the results of a simulation run."""
-    if not results:
+    if results is None or len(results) == 0:
         return "# No results"
 
     with sns.axes_style(style=style), \
             sns.plotting_context(context=context):
-        fig, ax = plt.subplots()
+        fig = Figure()
+        ax = fig.add_subplot(111)
         sns.histplot(results, ax=ax)
         ax.set(title=simulation.name)
         plot(fig)
@@ -321,7 +380,10 @@ def mc_plot_sim(simulation, results, style="whitegrid", context="paper"):
 @xl_func("object results: float")
 def mc_mean(results):
     """Return the mean of a list of results."""
-    if not results:
+    # fast path: Simulation.run returns a float ndarray
+    if isinstance(results, np.ndarray):
+        return results.mean() if results.size else "# No results"
+    if results is None or len(results) == 0:
         return "# No results"
     return np.mean(results)
 
@@ -329,6 +391,9 @@ def mc_mean(results):
 @xl_func("object results: float")
 def mc_stddev(results):
     """Return the standard deviation of a list of results."""
-    if not results:
+    # fast path: Simulation.run returns a float ndarray
+    if isinstance(results, np.ndarray):
+        return results.std() if results.size else "# No results"
+    if results is None or len(results) == 0:
         return "# No results"
     return np.std(results)
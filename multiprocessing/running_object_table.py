@@ -21,6 +21,7 @@ https://msdn.microsoft.com/en-us/library/windows/desktop/ms684004(v=vs.85).aspx
 from pyxll import xl_func, get_active_object
 from multiprocessing import Process
 import win32com.client
+import pywintypes
 import pythoncom
 import logging
 import time
@@ -29,6 +30,11 @@ import os
 
 IID_Workbook = pythoncom.MakeIID("{000208DA-0000-0000-C000-000000000046}")
 
+# The Application object found by get_xl_app. Each child process only
+# needs to resolve its parent Excel once; scanning the running object
+# table and binding each moniker is expensive.
+_xl_app_cache = None
+
 
 def get_xl_app(parent=None):
     """
@@ -38,6 +44,10 @@ def get_xl_app(parent=None):
     Application returned will always be the one that corresponds
     to the parent process.
     """
+    global _xl_app_cache
+    if _xl_app_cache is not None:
+        return _xl_app_cache
+
     # Get the window handle set by the parent process
     parent_hwnd = os.environ["PYXLL_EXCEL_HWND"]
 
@@ -63,6 +73,7 @@ def get_xl_app(parent=None):
             # Get the Application from the Workbook and if its window matches return it.
             xl_app = obj.Application
             if str(xl_app.Hwnd) == parent_hwnd:
+                _xl_app_cache = xl_app
                 return xl_app
 
     # This can happen if the parent process has terminated without terminating
@@ -83,10 +94,11 @@ def _subprocess_func(target_address, logfile):
         # Get the Excel Application corresponding to the parent process
         xl_app = get_xl_app()
 
-        # Write to the target cell in the parent Excel.
+        # Write to the target cell in the parent Excel. Value2 skips the
+        # per-put currency/date variant coercion that Value pays.
         cell = xl_app.Range(target_address)
         message = "Child process %d is running..." % os.getpid()
-        cell.Value = message
+        cell.Value2 = message
 
         # Run for a few seconds updating the value periodically
         for i in range(300):
@@ -95,13 +107,13 @@ def _subprocess_func(target_address, logfile):
             # When setting a value in Excel it may fail if the user is also
             # interacting with the sheet.
             try:
-                cell.Value = message
-            except:
+                cell.Value2 = message
+            except pywintypes.com_error:
                 log.warn("Error setting cell value", exc_info=True)
 
             time.sleep(0.2)
 
-        cell.Value = "Child process %d has terminated" % os.getpid()
+        cell.Value2 = "Child process %d has terminated" % os.getpid()
 
     except Exception:
         log.error("An error occured in the child process", exc_info=True)
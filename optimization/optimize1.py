@@ -8,6 +8,7 @@ extended to N.
 This code accompanies the blog post
   https://www.pyxll.com/blog/a-better-goal-seek/
 """
+from functools import partial
 from pyxll import xl_macro, xl_app
 from scipy.optimize import minimize
 from win32com.client import constants
@@ -16,39 +17,49 @@ import numpy as np
 @xl_macro(shortcut="Ctrl+Alt+P")
 def optimise1():
     xl = xl_app()
+    # Resolve the input and output Range objects once, rather than once
+    # per objective evaluation
+    in_x = xl.Range("C11")
+    in_y = xl.Range("C12")
+    output = xl.Range("E11")
+
     # Get the initial values of the input cells
-    x = xl.Range("C11").Value
-    y = xl.Range("C12").Value
-    X = np.array([x, y])
+    X = np.array([in_x.Value, in_y.Value])
 
     orig_calc_mode = xl.Calculation
+    orig_enable_events = xl.EnableEvents
     try:
-        # switch Excel to manual calculation
-        # and disable screen updating
+        # switch Excel to manual calculation and disable screen
+        # updating and event handlers; events would otherwise fire on
+        # every objective evaluation's write
         xl.Calculation = constants.xlManual
         xl.ScreenUpdating = False
+        xl.EnableEvents = False
 
         # run the minimization routine
-        minimize(obj_func, X, method='nelder-mead')
+        xl_obj_func = partial(obj_func, xl, in_x, in_y, output)
+        # Powell's method typically needs far fewer objective
+        # evaluations than Nelder-Mead, and each evaluation here is a
+        # full Excel recalculation
+        minimize(xl_obj_func, X, method='Powell')
 
     finally:
-        # restore the original calculation
-        # and screen updating mode
+        # restore the original calculation,
+        # event and screen updating modes
+        xl.EnableEvents = orig_enable_events
         xl.ScreenUpdating = True
         xl.Calculation = orig_calc_mode
 
 
-def obj_func(arg):
+def obj_func(xl, in_x, in_y, output, arg):
     """Wraps a spreadsheet computation as a Python function."""
-    xl = xl_app()
-    # Copy argument values to input range
-    xl.Range('C11').Value = float(arg[0])
-    xl.Range('C12').Value = float(arg[1])
+    # Copy argument values to the input cells
+    in_x.Value = float(arg[0])
+    in_y.Value = float(arg[1])
 
     # Calculate after changing the inputs
     xl.Calculate()
 
     # Return the value of the output cell
-    result = xl.Range("E11").Value
-    return result
+    return output.Value
 
@@ -20,36 +20,47 @@ from scipy.optimize import minimize
 @xl_macro(shortcut="Ctrl+Alt+R")
 def optimize3():
     xl = xl_app()
+    # Resolve the input and output Range objects once, rather than once
+    # per objective evaluation
+    inputs = xl.Range('Inputs')
+    output = xl.Range('Output')
+
     # Get the initial values of the input cells
-    in_values = xl.Range('Inputs').Value
-    X = np.array([x[0] for x in in_values])
+    in_values = inputs.Value
+    X = np.fromiter((x[0] for x in in_values), dtype=float, count=len(in_values))
 
     orig_calc_mode = xl.Calculation
+    orig_enable_events = xl.EnableEvents
     try:
-        # switch Excel to manual calculation
-        # and disable screen updating
+        # switch Excel to manual calculation and disable screen
+        # updating and event handlers; events would otherwise fire on
+        # every objective evaluation's write
         xl.Calculation = constants.xlManual
         xl.ScreenUpdating = False
+        xl.EnableEvents = False
 
         # run the minimization routine
-        xl_obj_func = partial(obj_func, xl)
-        minimize(xl_obj_func, X, method='nelder-mead')
+        xl_obj_func = partial(obj_func, xl, inputs, output)
+        # Powell's method typically needs far fewer objective
+        # evaluations than Nelder-Mead, and each evaluation here is a
+        # full Excel recalculation
+        minimize(xl_obj_func, X, method='Powell')
 
     finally:
-        # restore the original calculation
-        # and screen updating mode
+        # restore the original calculation,
+        # event and screen updating modes
+        xl.EnableEvents = orig_enable_events
         xl.ScreenUpdating = True
         xl.Calculation = orig_calc_mode
 
 
-def obj_func(xl, arg):
+def obj_func(xl, inputs, output, arg):
     """Wraps a spreadsheet computation as a Python function."""
     # Copy argument values to input range
-    xl.Range('Inputs').Value = [(float(x), ) for x in arg]
+    inputs.Value = [(float(x), ) for x in arg]
 
     # Calculate after changing the inputs
     xl.Calculate()
 
     # Return the value of the output cell
-    result = xl.Range("Output").Value
-    return result
+    return output.Value
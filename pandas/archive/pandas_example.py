@@ -17,14 +17,10 @@ import numpy as np
 
 @xl_func("int rows, int cols: dataframe")
 def make_random_dataframe(rows, cols):
-    # create a random dataframe
-    df_dict = {}
-    for col_index in range(cols):
-        col_name = chr(col_index + ord('A'))
-        col_values = [np.random.random() for r in range(rows)]
-        df_dict[col_name] = col_values
-
-    df = pa.DataFrame(df_dict)
+    # create a random dataframe with a single vectorized draw rather
+    # than one np.random.random() call per cell
+    columns = [chr(col_index + ord('A')) for col_index in range(cols)]
+    df = pa.DataFrame(np.random.random((rows, cols)), columns=columns)
 
     # return it. The custom type will convert this to a 2d array that
     # excel will understand when this function is called as an array
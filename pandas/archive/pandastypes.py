@@ -62,56 +62,102 @@ except ImportError:
     pywintypes = None
 
 
+def _dataframe_values(df):
+    """return the DataFrame's values as an ndarray, with NaNs in float
+    columns converted to exceptions so they appear correctly in Excel.
+
+    Only float columns can hold the NaNs we care about, so other columns
+    are passed through without being checked (NaT values are converted
+    later by _normalize_dates).
+    """
+    float_cols = np.fromiter((dtype.kind == "f" for dtype in df.dtypes),
+                             dtype=bool, count=df.shape[1])
+    if float_cols.any():
+        mask = df.isna().to_numpy() & float_cols
+        if mask.any():
+            values = df.to_numpy(dtype=object, copy=True)
+            values[mask] = RuntimeError()
+            return values
+
+    return df.to_numpy()
+
+
 @xl_return_type("dataframe", "var")
 def _dataframe_to_var(df):
     """return a list of lists that excel can understand"""
     if not isinstance(df, pa.DataFrame):
         return df
-    df = df.applymap(lambda x: RuntimeError() if isinstance(x, float) and np.isnan(x) else x)
- 
-    index_header = [str(df.index.name)] if df.index.name is not None else []
-    if isinstance(df.index, pa.MultiIndex):
-        index_header = [str(x) or "" for x in df.index.names]
-
-    if isinstance(df.columns, pa.MultiIndex):
-        result = [([""] * len(index_header)) + list(z) for z in zip(*list(df.columns))]
-        for header in result:
-            for i in range(1, len(header) - 1):
-                if header[-i] == header[-i-1]:
-                    header[-i] = ""
+
+    # bind the columns and index once; these properties and their list
+    # forms get used several times below
+    columns = df.columns
+    index = df.index
+    is_mi_columns = isinstance(columns, pa.MultiIndex)
+    is_mi_index = isinstance(index, pa.MultiIndex)
+    col_list = columns.tolist()
+
+    # fast path for the overwhelmingly common shape - flat columns and
+    # an unnamed, non-hierarchical index - which needs no header assembly
+    if not is_mi_columns and not is_mi_index \
+    and index.name is None and columns.name is None:
+        values = _dataframe_values(df)
+        return _normalize_dates([col_list, *values.tolist()])
+
+    values = _dataframe_values(df)
+
+    index_header = [str(index.name)] if index.name is not None else []
+    if is_mi_index:
+        index_header = [str(x) or "" for x in index.names]
+
+    if is_mi_columns:
+        headers = np.array([([""] * len(index_header)) + list(z)
+                            for z in zip(*col_list)], dtype=object)
+
+        # blank out repeated labels with a vectorized shift-compare
+        # instead of a nested Python loop over the levels
+        if headers.shape[1] > 2:
+            dup = headers[:, 2:] == headers[:, 1:-1]
+            headers[:, 2:][dup] = ""
 
         if index_header:
-            column_names = [x or "" for x in df.columns.names]
-            for i, col_name in enumerate(column_names):
-                result[i][len(index_header)-1] = col_name
-    
+            # overlay the column-level names in the last index column
+            # with one slice assignment
+            column_names = [x or "" for x in columns.names]
+            headers[:len(column_names), len(index_header)-1] = column_names
+
             if column_names[-1]:
                 index_header[-1] += (" \ " if index_header[-1] else "") + str(column_names[-1])
 
-            num_levels = len(df.columns.levels)
-            result[num_levels-1][:len(index_header)] = index_header
-    else:
-        if index_header and df.columns.name:
-            index_header[-1] += (" \ " if index_header[-1] else "") + str(df.columns.name)
-        result = [index_header + list(df.columns)]    
-
-    if isinstance(df.index, pa.MultiIndex):
-        prev_ix = None
-        for ix, row in df.iterrows():
-            header = list(ix)
-            if prev_ix:
-                header = [x if x != px else "" for (x, px) in zip(ix, prev_ix)]
-            result.append(header + list(row))
-            prev_ix = ix
-
-    elif index_header:
-        for ix, row in df.iterrows():
-            result.append([ix] + list(row))
+            num_levels = len(columns.levels)
+            headers[num_levels-1, :len(index_header)] = index_header
     else:
-        for ix, row in df.iterrows():
-            result.append(list(row))
-
-    return _normalize_dates(result)
+        if index_header and columns.name:
+            index_header[-1] += (" \ " if index_header[-1] else "") + str(columns.name)
+        headers = np.array([index_header + col_list], dtype=object)
+
+    # assemble everything into one preallocated rectangular array rather
+    # than appending a Python list per row
+    num_rows, num_cols = df.shape
+    num_header_rows = headers.shape[0]
+    num_index_cols = len(index_header)
+
+    out = np.empty((num_header_rows + num_rows, num_index_cols + num_cols), dtype=object)
+    out[:num_header_rows] = headers
+    out[num_header_rows:, num_index_cols:] = values
+
+    if num_rows:
+        if is_mi_index:
+            # blank out index labels repeated from the previous row with
+            # the same shift-compare as the column headers
+            idx_block = np.array(index.tolist(), dtype=object)
+            if num_rows > 1:
+                dup = idx_block[1:] == idx_block[:-1]
+                idx_block[1:][dup] = ""
+            out[num_header_rows:, :num_index_cols] = idx_block
+        elif index_header:
+            out[num_header_rows:, 0] = index.tolist()
+
+    return _normalize_dates(out.tolist())
 
 
 @xl_return_type("series", "var")
@@ -120,10 +166,17 @@ def _series_to_var(s):
     if not isinstance(s, pa.Series):
         return s
 
-    # convert any errors to exceptions so they appear correctly in Excel
-    s = s.apply(lambda x: RuntimeError() if isinstance(x, float) and np.isnan(x) else x)
+    # convert any NaNs to exceptions so they appear correctly in Excel
+    mask = s.isna().to_numpy()
+    if mask.any():
+        values = s.to_numpy(dtype=object, copy=True)
+        values[mask] = RuntimeError()
+    else:
+        values = s.to_numpy(dtype=object)
 
-    result = list(map(list, zip(s.index, s)))
+    # stack the index and values into one 2d block rather than building
+    # a list per item
+    result = np.column_stack([s.index.to_numpy(dtype=object), values]).tolist()
     return _normalize_dates(result)
 
 
@@ -133,10 +186,16 @@ def _series_to_var_transform(s):
     if not isinstance(s, pa.Series):
         return s
 
-    # convert any errors to exceptions so they appear correctly in Excel
-    s = s.apply(lambda x: RuntimeError() if isinstance(x, float) and np.isnan(x) else x)
+    # convert any NaNs to exceptions so they appear correctly in Excel
+    mask = s.isna().to_numpy()
+    if mask.any():
+        values = s.to_numpy(dtype=object, copy=True)
+        values[mask] = RuntimeError()
+    else:
+        values = s.to_numpy(dtype=object)
 
-    result = list(map(list, zip(*zip(s.index, s))))
+    # two rows: the index along the top and the values below
+    result = [s.index.tolist(), values.tolist()]
     return _normalize_dates(result)
 
 
@@ -1,11 +1,10 @@
-from pyxll import xl_func, xl_app, async_call
+from pyxll import xl_func, xl_app
 import matplotlib.pyplot as plt
 import win32gui, win32ui, win32con
 import torch.nn as nn
 import numpy as np
 import tempfile
 import torch
-import os
 
 
 class NN(nn.Module):
@@ -66,8 +65,15 @@ def nn_Run(net, image_name, scale=1, offset=-0.5, seed=None):
     sheet = xl.Caller.Worksheet
     image = sheet.Pictures(image_name)
 
+    # Read the image geometry once; every property access is a separate
+    # cross-process COM call
+    image_left = image.Left
+    image_top = image.Top
+    image_width = image.Width
+    image_height = image.Height
+
     # Get the image size in pixels
-    size_x, size_y = get_image_size(image)
+    size_x, size_y = get_image_size(image_width, image_height)
 
     # Create the inputs
     inputs = np.zeros((size_y, size_x, 2))
@@ -83,21 +89,23 @@ def nn_Run(net, image_name, scale=1, offset=-0.5, seed=None):
     result = net(torch.tensor(inputs).type(torch.FloatTensor)).detach().numpy()
     result = result.reshape((size_y, size_x, 3))
 
-    # Create a temporary file to write the result to
-    file = create_temporary_file(suffix=".png")
+    # Get the reusable temporary file to write the result to
+    file = get_temporary_file(suffix=".png")
 
-    # Write the image to the file
-    plt.imsave(file, result)
+    # Write the image to the file. The png is only decoded once by Excel
+    # so file size doesn't matter; the lowest compression level encodes
+    # several times faster than the default.
+    plt.imsave(file, result, pil_kwargs={"compress_level": 1})
     file.flush()
 
     # Replace the old image with the new one
     new_image = sheet.Shapes.AddPicture(Filename=file.name,
                                         LinkToFile=0,  # msoFalse
                                         SaveWithDocument=-1,  # msoTrue
-                                        Left=image.Left,
-                                        Top=image.Top,
-                                        Width=image.Width,
-                                        Height=image.Height)
+                                        Left=image_left,
+                                        Top=image_top,
+                                        Width=image_width,
+                                        Height=image_height)
 
     image_name = image.Name
     image.Delete()
@@ -106,35 +114,36 @@ def nn_Run(net, image_name, scale=1, offset=-0.5, seed=None):
     return f"[{new_image.Name}]"
 
 
-def get_image_size(image):
-    """Return the size of an image in pixels as (width, height)."""
-    # Get the size of the input image in pixels (Excel sizes are in points,
-    # or 1/72th of an inch.
+def get_image_size(width, height):
+    """Return the size of an image in pixels as (width, height), given
+    its size in points (1/72th of an inch)."""
     xl = xl_app()
     dc = win32gui.GetDC(xl.Hwnd)
     pixels_per_inch_x = win32ui.GetDeviceCaps(dc, win32con.LOGPIXELSX)
     pixels_per_inch_y = win32ui.GetDeviceCaps(dc, win32con.LOGPIXELSY)
-    size_x = int(image.Width * pixels_per_inch_x / 72)
-    size_y = int(image.Height * pixels_per_inch_y / 72)
+    size_x = int(width * pixels_per_inch_x / 72)
+    size_y = int(height * pixels_per_inch_y / 72)
 
     return size_x, size_y
 
 
-def create_temporary_file(suffix=None):
-    """Create a named temporary file that is deleted automatically."""
-    # Rather than delete the file when it's closed we delete it when the
-    # windows message loop next runs. This gives Excel enough time to
-    # load the image before the file disappears.
-    file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+# reusable temporary files, keyed by suffix
+_temp_files = {}
 
-    def try_delete(filename):
-        try:
-            os.unlink(filename)
-        except PermissionError:
-            # retry if Excel is still accessing it
-            async_call(os.unlink, filename)
 
-    # Make sure the file gets deleted after the function is complete
-    async_call(try_delete, file.name)
+def get_temporary_file(suffix=""):
+    """Return an open temporary file that is reused between calls.
 
+    Creating and deleting a fresh file per call churns the TEMP folder
+    (and can stall on anti-virus scanners), so the same file is kept
+    open and truncated each time instead. Excel has already loaded the
+    image by the time it's next overwritten.
+    """
+    file = _temp_files.get(suffix)
+    if file is None:
+        file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+        _temp_files[suffix] = file
+    else:
+        file.seek(0)
+        file.truncate()
     return file